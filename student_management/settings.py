@@ -52,6 +52,7 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'students.middleware.ServiceUnavailableMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -79,14 +80,53 @@ WSGI_APPLICATION = 'student_management.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# WAL lets readers proceed while a writer holds the lock, so gunicorn workers
+# sharing db.sqlite3 don't serialize on every request.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds to wait on a locked database (sets SQLite's busy timeout)
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-20000;'
+            ),
+        },
     }
 }
 
 
+# Cache and sessions
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/
+# The cache must be shared by all gunicorn workers: cached sessions and the
+# user cache version keys are only invalidated correctly if every worker sees
+# the same entries. The file cache is shared by every process on the host,
+# which is as far as the SQLite database is shared anyway.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        # Entries are unpickled on read, so this must be a directory only the app can write to
+        'LOCATION': os.getenv('DJANGO_CACHE_DIR', str(BASE_DIR / 'cache')),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
 load_dotenv(BASE_DIR / '.env')
 
 # AWS Configuration
@@ -97,6 +137,65 @@ AWS_DYNAMODB_TABLE = os.getenv('AWS_DYNAMODB_TABLE', 'StudentRecords')
 AWS_S3_BUCKET_NAME = os.getenv('AWS_S3_BUCKET_NAME')
 AWS_SNS_TOPIC_ARN = os.getenv('AWS_SNS_TOPIC_ARN')
 
+# Bounds on AWS calls so a slow backend can't tie up every gunicorn worker.
+# Deadlines are in seconds, keyed by operation name; a service's circuit opens
+# after AWS_CIRCUIT_FAILURE_THRESHOLD consecutive failures and is retried after
+# AWS_CIRCUIT_RESET_TIMEOUT seconds.
+AWS_CONNECT_TIMEOUT = float(os.getenv('AWS_CONNECT_TIMEOUT', '2'))
+AWS_READ_TIMEOUT = float(os.getenv('AWS_READ_TIMEOUT', '5'))
+AWS_MAX_ATTEMPTS = int(os.getenv('AWS_MAX_ATTEMPTS', '2'))
+AWS_OPERATION_TIMEOUTS = {
+    'default': 3.0,
+    'scan': 5.0,
+    'put_object': 15.0,
+    'publish': 2.0,
+}
+AWS_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('AWS_CIRCUIT_FAILURE_THRESHOLD', '5'))
+AWS_CIRCUIT_RESET_TIMEOUT = float(os.getenv('AWS_CIRCUIT_RESET_TIMEOUT', '30'))
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.1/topics/logging/
+# Handlers for the ``students`` logger are moved behind a queue in
+# StudentsConfig.ready(), so writes happen on a background thread.
+# Routine INFO records are sampled; warnings and errors are always kept.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sample_routine': {
+            '()': 'students.logging_utils.SamplingFilter',
+            'rate': float(os.getenv('STUDENTS_LOG_SAMPLE_RATE', '0.1')),
+        },
+    },
+    'formatters': {
+        'structured': {
+            '()': 'students.logging_utils.StructuredFormatter',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'structured',
+        },
+    },
+    'loggers': {
+        'students': {
+            'handlers': ['console'],
+            'filters': ['sample_routine'],
+            'level': os.getenv('STUDENTS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'botocore': {
+            'level': 'WARNING',
+        },
+        'boto3': {
+            'level': 'WARNING',
+        },
+    },
+}
+
 
 # Static files
 STATIC_URL = '/static/'
@@ -108,6 +207,18 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# request.user is served from a bounded per-process cache. Saving or deleting a
+# User bumps a version key in the shared cache, which makes every worker reload
+# that user; entries also expire after USER_CACHE_TTL seconds.
+# ModelBackend stays listed so sessions created before the cached backend was
+# added (which store its path) remain valid instead of being logged out.
+AUTHENTICATION_BACKENDS = [
+    'students.auth_backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', '1024'))
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '60'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
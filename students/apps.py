@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class StudentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'students'
+
+    def ready(self):
+        from .logging_utils import start_queue_listener
+        start_queue_listener(self.name)
+
+        # Connect the user cache invalidation signals
+        from . import auth_backends  # noqa: F401
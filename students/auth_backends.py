@@ -0,0 +1,95 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+def user_version_key(user_id):
+    return f'user-version:{user_id}'
+
+
+class UserCache:
+    """Bounded, per-process LRU cache of User rows keyed by primary key.
+
+    Each entry remembers the shared version it was loaded under; a lookup with
+    a different version is a miss. Entries also expire after ``ttl`` seconds as
+    a backstop in case the shared version key is evicted.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version=None):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, cached_version, expires_at = entry
+            if cached_version != version or expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Hand out a copy so per-request attribute changes don't leak between requests
+        return copy.copy(user)
+
+    def set(self, user_id, user, version=None):
+        with self._lock:
+            self._entries[user_id] = (copy.copy(user), version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, 'USER_CACHE_MAX_SIZE', 1024),
+    ttl=getattr(settings, 'USER_CACHE_TTL', 60),
+)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that serves request.user lookups from ``user_cache``.
+
+    A cached user is only reused while its version matches the one in the
+    shared cache, so a change saved by any worker is seen by all of them on
+    their next request.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        version = cache.get(user_version_key(user_id))
+        user = user_cache.get(user_id, version)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache.set(user_id, user, version)
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Evict a user everywhere whenever their row changes (password, profile, is_active, deletion)."""
+    cache.set(user_version_key(instance.pk), uuid.uuid4().hex, None)
+    user_cache.invalidate(instance.pk)
@@ -0,0 +1,103 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+
+# Attributes every LogRecord carries; anything else was passed via ``extra``.
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listeners = {}
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of routine (below WARNING) records; always keep warnings and errors."""
+
+    def __init__(self, rate=1.0, name=''):
+        super().__init__(name)
+        self.rate = max(0.0, min(1.0, float(rate)))
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """Render records as ``key=value`` pairs, including any fields passed via ``extra``."""
+
+    def format(self, record):
+        fields = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                fields[key] = value
+        line = ' '.join(f'{key}={self._quote(value)}' for key, value in fields.items())
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        return line
+
+    @staticmethod
+    def _quote(value):
+        text = str(value)
+        if not text or any(c in text for c in ' ="'):
+            text = '"' + text.replace('"', '\\"') + '"'
+        return text
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock ``prepare`` merges ``msg % args`` on the calling thread so the
+    record can be pickled; the queue here is in-process, so the record is
+    passed through untouched and formatted by the real handlers off the
+    request path.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def start_queue_listener(logger_name):
+    """Move the handlers configured for ``logger_name`` behind a queue.
+
+    Handlers and levels still come from Django's ``LOGGING`` setting; this
+    only swaps them for a single ``DeferredQueueHandler`` and starts a
+    ``QueueListener`` that writes to the original handlers in the background.
+    Filters set on the logger are moved to the queue handler, so they also
+    apply to records from child loggers and drop them before they are queued.
+    Safe to call more than once.
+    """
+    if logger_name in _listeners:
+        return _listeners[logger_name]
+
+    target = logging.getLogger(logger_name)
+    handlers = list(target.handlers)
+    if not handlers:
+        return None
+
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        target.removeHandler(handler)
+    queue_handler = DeferredQueueHandler(log_queue)
+    for log_filter in list(target.filters):
+        target.removeFilter(log_filter)
+        queue_handler.addFilter(log_filter)
+    target.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_queue_listener, logger_name)
+    _listeners[logger_name] = listener
+    return listener
+
+
+def stop_queue_listener(logger_name):
+    """Flush and stop the listener started for ``logger_name``, if any."""
+    listener = _listeners.pop(logger_name, None)
+    if listener is not None:
+        listener.stop()
@@ -0,0 +1,21 @@
+from django.contrib import messages
+from django.http import HttpResponseRedirect
+
+from .resilience import ServiceUnavailable
+
+
+class ServiceUnavailableMiddleware:
+    """Turn a failed write to an unavailable AWS backend into a message on the same page."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        # Reads fall back to stale snapshots, so only writes should get here
+        if not isinstance(exception, ServiceUnavailable) or request.method != 'POST':
+            return None
+        messages.error(request, f"Your changes were not saved. {exception}")
+        return HttpResponseRedirect(request.get_full_path())
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+
+# ClientError codes that mean the service is struggling rather than the request being wrong
+_RETRYABLE_ERROR_CODES = frozenset({
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'ThrottlingException',
+    'Throttling',
+    'SlowDown',
+    'InternalServerError',
+    'InternalError',
+    'ServiceUnavailable',
+})
+
+
+class ServiceUnavailable(Exception):
+    """An AWS backend could not serve the call; the message is safe to show to users."""
+
+
+class CircuitOpenError(ServiceUnavailable):
+    pass
+
+
+class DeadlineExceeded(ServiceUnavailable):
+    pass
+
+
+def is_service_failure(exc):
+    """Return True if ``exc`` should count against a service's circuit breaker."""
+    if isinstance(exc, (ServiceUnavailable, BotoCoreError)):
+        return True
+    if isinstance(exc, ClientError):
+        error = exc.response.get('Error', {})
+        status = exc.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return status >= 500 or error.get('Code') in _RETRYABLE_ERROR_CODES
+    return False
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for a single backend service."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_total = 0
+        self.rejected_total = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go through; at most one trial call while half-open."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected_total += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                # WARNING rather than INFO so SamplingFilter never drops a state change
+                logger.warning("Circuit for %s closed.", self.name,
+                               extra={'event': 'circuit.closed', 'service': self.name})
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened_total += 1
+                    logger.warning("Circuit for %s opened after %d failures.", self.name, self.failures,
+                                   extra={'event': 'circuit.opened', 'service': self.name})
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'opened_total': self.opened_total,
+                'rejected_total': self.rejected_total,
+            }
+
+
+class ServiceGuard:
+    """Runs backend calls under a per-operation deadline and a per-service circuit breaker.
+
+    Calls run on a small thread pool so a hung request only ties up a pool
+    thread, not the gunicorn worker that is waiting on it. A call that misses
+    its deadline keeps running in the background, so ``fn`` must be
+    thread-safe (a boto3 client method, not a resource) and must not touch
+    request-scoped objects such as uploaded files.
+
+    Breakers and counters live in this object, so each gunicorn worker has
+    its own and reports only its own numbers.
+    """
+
+    def __init__(self, timeouts=None, failure_threshold=5, reset_timeout=30, max_workers=8):
+        self.timeouts = {'default': 5.0, **(timeouts or {})}
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self.stale_serves = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='aws-call')
+
+    def breaker(self, service):
+        with self._lock:
+            if service not in self.breakers:
+                self.breakers[service] = CircuitBreaker(service, self.failure_threshold, self.reset_timeout)
+            return self.breakers[service]
+
+    def call(self, service, operation, fn, *args, **kwargs):
+        """Call ``fn`` for ``service``.
+
+        Raises ServiceUnavailable if the breaker is open, the deadline passes or
+        the service can't be reached; ClientErrors from the service are re-raised.
+        """
+        breaker = self.breaker(service)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{service.upper()} is temporarily unavailable. Please try again shortly.")
+
+        timeout = self.timeouts.get(operation, self.timeouts['default'])
+        future = self._executor.submit(fn, *args, **kwargs)
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            breaker.record_failure()
+            logger.error("%s %s exceeded its %.1fs deadline.", service, operation, timeout,
+                         extra={'event': 'aws.deadline_exceeded', 'service': service, 'operation': operation})
+            raise DeadlineExceeded(f"{service.upper()} did not respond in time. Please try again shortly.")
+        except BotoCoreError as e:
+            # Connection and read errors never reached the service; report them like an outage
+            breaker.record_failure()
+            logger.error("%s %s failed: %s", service, operation, e,
+                         extra={'event': 'aws.call_failed', 'service': service, 'operation': operation})
+            raise ServiceUnavailable(f"{service.upper()} could not be reached. Please try again shortly.") from e
+        except Exception as e:
+            if is_service_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    def record_stale(self, operation):
+        with self._lock:
+            self.stale_serves[operation] = self.stale_serves.get(operation, 0) + 1
+        logger.warning("Serving stale snapshot for %s.", operation,
+                       extra={'event': 'aws.stale_served', 'operation': operation})
+
+    def metrics(self):
+        with self._lock:
+            breakers = dict(self.breakers)
+            stale_serves = dict(self.stale_serves)
+        return {
+            'breakers': {name: breaker.metrics() for name, breaker in breakers.items()},
+            'stale_serves': stale_serves,
+        }
+
+
+class StaleList(list):
+    """A list served from the last known good snapshot."""
+    stale = True
+
+
+class StaleDict(dict):
+    """A dict served from the last known good snapshot."""
+    stale = True
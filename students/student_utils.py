@@ -1,47 +1,78 @@
 import boto3
-from botocore.exceptions import ClientError
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 from django.conf import settings
 from django.contrib.auth.models import User
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from .resilience import ServiceGuard, ServiceUnavailable, StaleDict, StaleList, is_service_failure
+
+# Handlers, levels and sampling come from settings.LOGGING
 logger = logging.getLogger(__name__)
 
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def to_dynamodb(item):
+    """Convert a plain dict to the typed attribute map the DynamoDB client expects."""
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+def from_dynamodb(item):
+    """Convert a typed attribute map from the DynamoDB client back to a plain dict."""
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
 class StudentManager:
     def __init__(self):
         # Validate AWS settings
         self._validate_aws_settings()
 
-        # Initialize AWS clients
-        self.dynamodb = boto3.resource(
-            'dynamodb',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
+        # Bound every AWS call: tight botocore timeouts/retries, plus a per-operation
+        # deadline and per-service circuit breaker enforced by the guard
+        self.guard = ServiceGuard(
+            timeouts=settings.AWS_OPERATION_TIMEOUTS,
+            failure_threshold=settings.AWS_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.AWS_CIRCUIT_RESET_TIMEOUT,
+        )
+        client_config = Config(
+            connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+            read_timeout=settings.AWS_READ_TIMEOUT,
+            retries={'max_attempts': settings.AWS_MAX_ATTEMPTS, 'mode': 'standard'},
         )
+
+        # Last known good results, served (marked stale) while a backend is unavailable
+        self._snapshots = {}
+        self._student_snapshots = {}
+
+        # Initialize AWS clients. Guarded calls run on pool threads, so only
+        # clients (which are thread-safe) are used, never boto3 resources.
         self.dynamodb_client = boto3.client(
             'dynamodb',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
+            region_name=settings.AWS_REGION,
+            config=client_config
         )
         self.s3 = boto3.client(
             's3',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
+            region_name=settings.AWS_REGION,
+            config=client_config
         )
         self.sns = boto3.client(
             'sns',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
+            region_name=settings.AWS_REGION,
+            config=client_config
         )
 
-        # Initialize DynamoDB tables
-        self.students_table = self.dynamodb.Table(settings.AWS_DYNAMODB_TABLE)
-        self.courses_table = self.dynamodb.Table('Courses')
+        # DynamoDB tables
+        self.students_table_name = settings.AWS_DYNAMODB_TABLE
+        self.courses_table_name = 'Courses'
 
         # Ensure the Courses table exists and seed default courses
         self.ensure_courses_table()
@@ -60,31 +91,32 @@ class StudentManager:
             if not value:
                 raise ValueError(f"Missing required AWS setting: {key}")
         # AWS_SNS_TOPIC_ARN is optional; we'll check it before using SNS
-        logger.info("AWS settings validated successfully.")
+        logger.info("AWS settings validated successfully.", extra={'event': 'aws.settings_validated'})
 
     def ensure_courses_table(self):
         """Ensure the Courses table exists in DynamoDB."""
         try:
-            self.dynamodb_client.describe_table(TableName='Courses')
-            logger.info("Courses table already exists.")
+            self.dynamodb_client.describe_table(TableName=self.courses_table_name)
+            logger.info("Courses table already exists.", extra={'event': 'courses.table_exists'})
         except self.dynamodb_client.exceptions.ResourceNotFoundException:
             try:
                 self.dynamodb_client.create_table(
-                    TableName='Courses',
+                    TableName=self.courses_table_name,
                     KeySchema=[{'AttributeName': 'name', 'KeyType': 'HASH'}],
                     AttributeDefinitions=[{'AttributeName': 'name', 'AttributeType': 'S'}],
                     BillingMode='PAY_PER_REQUEST'
                 )
-                self.dynamodb_client.get_waiter('table_exists').wait(TableName='Courses')
-                logger.info("Courses table created successfully.")
+                self.dynamodb_client.get_waiter('table_exists').wait(TableName=self.courses_table_name)
+                logger.info("Courses table created successfully.", extra={'event': 'courses.table_created'})
             except ClientError as e:
-                logger.error(f"Error creating Courses table: {str(e)}")
+                logger.error("Error creating Courses table: %s", e, extra={'event': 'courses.table_create_failed'})
                 raise
 
     def seed_courses(self):
         """Seed default courses into DynamoDB if none exist."""
         try:
-            existing_courses = self.get_all_courses()
+            # Never seed from a snapshot or an error: an unavailable table is not an empty one
+            existing_courses = self.get_all_courses(allow_stale=False)
             if not existing_courses:
                 default_courses = [
                     {'name': 'Master of Computer Application (MCA)', 'duration': '2 years'},
@@ -92,35 +124,39 @@ class StudentManager:
                     {'name': 'BSc in Data Science', 'duration': '4 years'},
                 ]
                 for course in default_courses:
-                    self.courses_table.put_item(Item=course)
-                logger.info("Default courses seeded successfully.")
+                    self.dynamodb_client.put_item(TableName=self.courses_table_name, Item=to_dynamodb(course))
+                logger.info("Default courses seeded successfully.", extra={'event': 'courses.seeded'})
             else:
-                logger.info(f"Found {len(existing_courses)} existing courses, skipping seeding.")
+                logger.info("Found %d existing courses, skipping seeding.", len(existing_courses), extra={'event': 'courses.seed_skipped', 'count': len(existing_courses)})
         except ClientError as e:
-            logger.error(f"Error seeding courses: {str(e)}")
+            logger.error("Error seeding courses: %s", e, extra={'event': 'courses.seed_failed'})
             raise
 
     def add_student(self, student_data, profile_picture=None, user=None):
         """Add a new student to DynamoDB and upload profile picture to S3."""
         try:
             if not user:
-                logger.error("No user provided for adding student.")
+                logger.error("No user provided for adding student.", extra={'event': 'student.add_failed'})
                 return False
 
             student_id = student_data.get('student_id')
             if not student_id:
-                logger.error("Student ID is required.")
+                logger.error("Student ID is required.", extra={'event': 'student.add_failed'})
                 return False
 
             profile_picture_url = ''
             if profile_picture:
                 try:
                     s3_key = f"student-profiles/{student_id}/{profile_picture.name}"
-                    self.s3.upload_fileobj(profile_picture, settings.AWS_S3_BUCKET_NAME, s3_key)
+                    # Read on the request thread: the upload may outlive its deadline on a
+                    # pool thread, after Django has closed the uploaded file
+                    body = profile_picture.read()
+                    self.guard.call('s3', 'put_object', self.s3.put_object,
+                                    Bucket=settings.AWS_S3_BUCKET_NAME, Key=s3_key, Body=body)
                     profile_picture_url = f"https://{settings.AWS_S3_BUCKET_NAME}.s3.amazonaws.com/{s3_key}"
-                    logger.info(f"Profile picture uploaded to S3: {profile_picture_url}")
+                    logger.info("Profile picture uploaded to S3: %s", profile_picture_url, extra={'event': 'student.picture_uploaded', 'student_id': student_id})
                 except ClientError as e:
-                    logger.error(f"Failed to upload profile picture to S3 for student {student_id}: {str(e)}")
+                    logger.error("Failed to upload profile picture to S3 for student %s: %s", student_id, e, extra={'event': 'student.picture_upload_failed', 'student_id': student_id})
                     raise
 
             item = {
@@ -133,78 +169,114 @@ class StudentManager:
                 'profile_picture': profile_picture_url,
                 'user_id': str(user.id)  # Associate with the user
             }
-            self.students_table.put_item(Item=item)
+            self.guard.call('dynamodb', 'put_item', self.dynamodb_client.put_item,
+                            TableName=self.students_table_name, Item=to_dynamodb(item))
 
             # Send SNS notification for new student if configured
             if hasattr(settings, 'AWS_SNS_TOPIC_ARN') and settings.AWS_SNS_TOPIC_ARN:
                 try:
-                    self.sns.publish(
+                    self.guard.call(
+                        'sns', 'publish', self.sns.publish,
                         TopicArn=settings.AWS_SNS_TOPIC_ARN,
                         Message=f"New student added by {user.username}: {item['first_name']} {item['last_name']} (ID: {student_id})",
                         Subject="New Student Added"
                     )
-                    logger.info(f"SNS notification sent for new student {student_id}.")
-                except ClientError as e:
-                    logger.error(f"Failed to send SNS notification for student {student_id}: {str(e)}")
+                    logger.info("SNS notification sent for new student %s.", student_id, extra={'event': 'student.add_notified', 'student_id': student_id})
+                except (ClientError, BotoCoreError, ServiceUnavailable) as e:
+                    logger.error("Failed to send SNS notification for student %s: %s", student_id, e, extra={'event': 'student.add_notify_failed', 'student_id': student_id})
                     # Continue even if SNS fails, as it's not critical to the operation
 
-            logger.info(f"Student {student_id} added successfully by user {user.username}.")
+            logger.info("Student %s added successfully by user %s.", student_id, user.username, extra={'event': 'student.added', 'student_id': student_id, 'user': user.username})
             return True
 
+        except ServiceUnavailable:
+            raise
         except ClientError as e:
-            logger.error(f"Error adding student {student_id}: {str(e)}")
+            logger.error("Error adding student %s: %s", student_id, e, extra={'event': 'student.add_failed', 'student_id': student_id})
             return False
         except Exception as e:
-            logger.error(f"Unexpected error adding student {student_id}: {str(e)}")
+            logger.error("Unexpected error adding student %s: %s", student_id, e, extra={'event': 'student.add_failed', 'student_id': student_id})
             return False
 
-    def get_student(self, student_id, user=None):
-        """Retrieve a student by student_id for the specified user."""
+    def get_student(self, student_id, user=None, allow_stale=True):
+        """Retrieve a student by student_id for the specified user.
+
+        While DynamoDB is unavailable the last known copy is returned as a StaleDict.
+        Reads that feed a write pass allow_stale=False to get the error instead.
+        """
         try:
-            response = self.students_table.get_item(Key={'student_id': student_id})
-            student = response.get('Item')
-            if not student:
-                logger.warning(f"Student {student_id} not found.")
-                return None
-            # Check if the student belongs to the user
-            if user and str(student.get('user_id', '')) != str(user.id):
-                logger.warning(f"User {user.username} does not have access to student {student_id}.")
+            response = self.guard.call('dynamodb', 'get_item', self.dynamodb_client.get_item,
+                                       TableName=self.students_table_name, Key=to_dynamodb({'student_id': student_id}))
+            student = from_dynamodb(response['Item']) if 'Item' in response else None
+            if student:
+                self._student_snapshots[student_id] = student
+            else:
+                self._student_snapshots.pop(student_id, None)
+        except (ClientError, BotoCoreError, ServiceUnavailable) as e:
+            logger.error("Error retrieving student %s: %s", student_id, e, extra={'event': 'student.get_failed', 'student_id': student_id})
+            if not allow_stale and is_service_failure(e):
+                raise
+            if not is_service_failure(e) or student_id not in self._student_snapshots:
                 return None
-            return student
-        except ClientError as e:
-            logger.error(f"Error retrieving student {student_id}: {str(e)}")
+            self.guard.record_stale('get_student')
+            student = StaleDict(self._student_snapshots[student_id])
+
+        if not student:
+            logger.warning("Student %s not found.", student_id, extra={'event': 'student.not_found', 'student_id': student_id})
             return None
+        # Check if the student belongs to the user
+        if user and str(student.get('user_id', '')) != str(user.id):
+            logger.warning("User %s does not have access to student %s.", user.username, student_id, extra={'event': 'student.access_denied', 'student_id': student_id, 'user': user.username})
+            return None
+        return student
 
     def get_all_students(self, user=None):
-        """Retrieve all students for the specified user from DynamoDB."""
+        """Retrieve all students for the specified user from DynamoDB.
+
+        While DynamoDB is unavailable the last successful scan is returned as a StaleList.
+        """
+        stale = False
         try:
-            response = self.students_table.scan()
-            students = response.get('Items', [])
-            if user:
-                students = [s for s in students if str(s.get('user_id', '')) == str(user.id)]
-            logger.info(f"Retrieved {len(students)} students for user {user.username if user else 'all users'}.")
-            return students
-        except ClientError as e:
-            logger.error(f"Error scanning students: {str(e)}")
-            return []
+            response = self.guard.call('dynamodb', 'scan', self.dynamodb_client.scan, TableName=self.students_table_name)
+            students = [from_dynamodb(item) for item in response.get('Items', [])]
+            self._snapshots['students'] = students
+            self._student_snapshots = {s['student_id']: s for s in students}
+        except (ClientError, BotoCoreError, ServiceUnavailable) as e:
+            logger.error("Error scanning students: %s", e, extra={'event': 'students.scan_failed'})
+            if not is_service_failure(e) or 'students' not in self._snapshots:
+                return []
+            self.guard.record_stale('get_all_students')
+            students = self._snapshots['students']
+            stale = True
+
+        if user:
+            students = [s for s in students if str(s.get('user_id', '')) == str(user.id)]
+        username = user.username if user else 'all users'
+        logger.info("Retrieved %d students for user %s.", len(students), username,
+                    extra={'event': 'students.scanned', 'count': len(students), 'user': username})
+        return StaleList(students) if stale else students
 
     def update_student(self, student_id, updated_data, profile_picture=None, user=None):
         """Update an existing student."""
         try:
-            student = self.get_student(student_id, user)
+            student = self.get_student(student_id, user, allow_stale=False)
             if not student:
-                logger.warning(f"Student {student_id} not found or user {user.username if user else 'unknown'} does not have access.")
+                logger.warning("Student %s not found or user %s does not have access.", student_id, user.username if user else 'unknown', extra={'event': 'student.access_denied', 'student_id': student_id})
                 return False
 
             profile_picture_url = student.get('profile_picture', '')
             if profile_picture:
                 try:
                     s3_key = f"student-profiles/{student_id}/{profile_picture.name}"
-                    self.s3.upload_fileobj(profile_picture, settings.AWS_S3_BUCKET_NAME, s3_key)
+                    # Read on the request thread: the upload may outlive its deadline on a
+                    # pool thread, after Django has closed the uploaded file
+                    body = profile_picture.read()
+                    self.guard.call('s3', 'put_object', self.s3.put_object,
+                                    Bucket=settings.AWS_S3_BUCKET_NAME, Key=s3_key, Body=body)
                     profile_picture_url = f"https://{settings.AWS_S3_BUCKET_NAME}.s3.amazonaws.com/{s3_key}"
-                    logger.info(f"Profile picture updated for student {student_id}: {profile_picture_url}")
+                    logger.info("Profile picture updated for student %s: %s", student_id, profile_picture_url, extra={'event': 'student.picture_uploaded', 'student_id': student_id})
                 except ClientError as e:
-                    logger.error(f"Failed to upload profile picture to S3 for student {student_id}: {str(e)}")
+                    logger.error("Failed to upload profile picture to S3 for student %s: %s", student_id, e, extra={'event': 'student.picture_upload_failed', 'student_id': student_id})
                     raise
 
             item = {
@@ -217,43 +289,49 @@ class StudentManager:
                 'profile_picture': profile_picture_url,
                 'user_id': student['user_id']  # Retain the original user_id
             }
-            self.students_table.put_item(Item=item)
-            logger.info(f"Student {student_id} updated successfully by user {user.username if user else 'unknown'}.")
+            self.guard.call('dynamodb', 'put_item', self.dynamodb_client.put_item,
+                            TableName=self.students_table_name, Item=to_dynamodb(item))
+            logger.info("Student %s updated successfully by user %s.", student_id, user.username if user else 'unknown', extra={'event': 'student.updated', 'student_id': student_id})
             return True
+        except ServiceUnavailable:
+            raise
         except ClientError as e:
-            logger.error(f"Error updating student {student_id}: {str(e)}")
+            logger.error("Error updating student %s: %s", student_id, e, extra={'event': 'student.update_failed', 'student_id': student_id})
             return False
         except Exception as e:
-            logger.error(f"Unexpected error updating student {student_id}: {str(e)}")
+            logger.error("Unexpected error updating student %s: %s", student_id, e, extra={'event': 'student.update_failed', 'student_id': student_id})
             return False
 
     def delete_student(self, student_id, user=None):
         """Delete a student from DynamoDB."""
         try:
-            student = self.get_student(student_id, user)
+            student = self.get_student(student_id, user, allow_stale=False)
             if not student:
-                logger.warning(f"Student {student_id} not found or user {user.username if user else 'unknown'} does not have access.")
+                logger.warning("Student %s not found or user %s does not have access.", student_id, user.username if user else 'unknown', extra={'event': 'student.access_denied', 'student_id': student_id})
                 return False
 
-            self.students_table.delete_item(Key={'student_id': student_id})
+            self.guard.call('dynamodb', 'delete_item', self.dynamodb_client.delete_item,
+                            TableName=self.students_table_name, Key=to_dynamodb({'student_id': student_id}))
+            self._student_snapshots.pop(student_id, None)
 
             # Send SNS email notification for student deletion if configured
             if hasattr(settings, 'AWS_SNS_TOPIC_ARN') and settings.AWS_SNS_TOPIC_ARN:
                 try:
-                    self.sns.publish(
+                    self.guard.call(
+                        'sns', 'publish', self.sns.publish,
                         TopicArn=settings.AWS_SNS_TOPIC_ARN,
                         Message=f"Student deleted by {user.username if user else 'unknown'}: {student['first_name']} {student['last_name']} (Roll Number: {student_id})",
                         Subject="Student Deleted Notification"
                     )
-                    logger.info(f"SNS notification sent for student deletion {student_id}.")
-                except ClientError as e:
-                    logger.error(f"Failed to send SNS notification for student deletion {student_id}: {str(e)}")
+                    logger.info("SNS notification sent for student deletion %s.", student_id, extra={'event': 'student.delete_notified', 'student_id': student_id})
+                except (ClientError, BotoCoreError, ServiceUnavailable) as e:
+                    logger.error("Failed to send SNS notification for student deletion %s: %s", student_id, e, extra={'event': 'student.delete_notify_failed', 'student_id': student_id})
                     # Continue even if SNS fails
 
-            logger.info(f"Student {student_id} deleted successfully by user {user.username if user else 'unknown'}.")
+            logger.info("Student %s deleted successfully by user %s.", student_id, user.username if user else 'unknown', extra={'event': 'student.deleted', 'student_id': student_id})
             return True
         except ClientError as e:
-            logger.error(f"Error deleting student {student_id}: {str(e)}")
+            logger.error("Error deleting student %s: %s", student_id, e, extra={'event': 'student.delete_failed', 'student_id': student_id})
             return False
 
     def add_course(self, course_data):
@@ -261,52 +339,67 @@ class StudentManager:
         try:
             course_name = course_data.get('name')
             if not course_name:
-                logger.error("Course name is required.")
+                logger.error("Course name is required.", extra={'event': 'course.add_failed'})
                 return False
 
-            existing_course = self.courses_table.get_item(Key={'name': course_name}).get('Item')
+            response = self.guard.call('dynamodb', 'get_item', self.dynamodb_client.get_item,
+                                       TableName=self.courses_table_name, Key=to_dynamodb({'name': course_name}))
+            existing_course = response.get('Item')
             if existing_course:
-                logger.warning(f"Course {course_name} already exists.")
+                logger.warning("Course %s already exists.", course_name, extra={'event': 'course.exists', 'course': course_name})
                 return False
 
             item = {
                 'name': course_name,
                 'duration': course_data.get('duration', '')
             }
-            self.courses_table.put_item(Item=item)
-            logger.info(f"Course {course_name} added successfully.")
+            self.guard.call('dynamodb', 'put_item', self.dynamodb_client.put_item,
+                            TableName=self.courses_table_name, Item=to_dynamodb(item))
+            logger.info("Course %s added successfully.", course_name, extra={'event': 'course.added', 'course': course_name})
             return True
         except ClientError as e:
-            logger.error(f"Error adding course: {str(e)}")
+            logger.error("Error adding course: %s", e, extra={'event': 'course.add_failed'})
             return False
 
-    def get_all_courses(self):
-        """Retrieve all courses from DynamoDB."""
+    def get_all_courses(self, allow_stale=True):
+        """Retrieve all courses from DynamoDB.
+
+        While DynamoDB is unavailable the last successful scan is returned as a StaleList;
+        with allow_stale=False the error is raised instead.
+        """
         try:
-            response = self.courses_table.scan()
-            courses = response.get('Items', [])
-            logger.info(f"Retrieved {len(courses)} courses from DynamoDB.")
+            response = self.guard.call('dynamodb', 'scan', self.dynamodb_client.scan, TableName=self.courses_table_name)
+            courses = [from_dynamodb(item) for item in response.get('Items', [])]
+            self._snapshots['courses'] = courses
+            logger.info("Retrieved %d courses from DynamoDB.", len(courses), extra={'event': 'courses.scanned', 'count': len(courses)})
             return courses
-        except ClientError as e:
-            logger.error(f"Error scanning courses: {str(e)}")
-            return []
+        except (ClientError, BotoCoreError, ServiceUnavailable) as e:
+            logger.error("Error scanning courses: %s", e, extra={'event': 'courses.scan_failed'})
+            if not allow_stale and is_service_failure(e):
+                raise
+            if not is_service_failure(e) or 'courses' not in self._snapshots:
+                return []
+            self.guard.record_stale('get_all_courses')
+            return StaleList(self._snapshots['courses'])
 
     def update_course(self, course_id, updated_data):
         """Update an existing course."""
         try:
             course_name = updated_data.get('name')
             if not course_name:
-                logger.error("Updated course name is required.")
+                logger.error("Updated course name is required.", extra={'event': 'course.update_failed'})
                 return False
 
-            self.courses_table.delete_item(Key={'name': course_id})
+            self.guard.call('dynamodb', 'delete_item', self.dynamodb_client.delete_item,
+                            TableName=self.courses_table_name, Key=to_dynamodb({'name': course_id}))
             item = {
                 'name': course_name,
                 'duration': updated_data.get('duration', '')
             }
-            self.courses_table.put_item(Item=item)
-            logger.info(f"Course {course_id} updated successfully to {course_name}.")
+            self.guard.call('dynamodb', 'put_item', self.dynamodb_client.put_item,
+                            TableName=self.courses_table_name, Item=to_dynamodb(item))
+            logger.info("Course %s updated successfully to %s.", course_id, course_name, extra={'event': 'course.updated', 'course': course_name})
             return True
         except ClientError as e:
-            logger.error(f"Error updating course {course_id}: {str(e)}")
+            logger.error("Error updating course %s: %s", course_id, e, extra={'event': 'course.update_failed', 'course': course_id})
             return False
\ No newline at end of file
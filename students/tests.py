@@ -1,3 +1,300 @@
-from django.test import TestCase
+import logging
+import threading
+from unittest import mock
 
-# Create your tests here.
+from botocore.exceptions import ClientError, EndpointConnectionError
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .auth_backends import CachedModelBackend, UserCache, user_cache, user_version_key
+from .logging_utils import (
+    DeferredQueueHandler, SamplingFilter, StructuredFormatter, start_queue_listener, stop_queue_listener,
+)
+from .middleware import ServiceUnavailableMiddleware
+from .resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, ServiceGuard, ServiceUnavailable, StaleDict, StaleList,
+)
+from .student_utils import StudentManager, to_dynamodb
+
+
+def make_record(level=logging.INFO, msg='hello %s', args=('world',), name='students.test', **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class SamplingFilterTests(SimpleTestCase):
+    def test_always_keeps_warnings_and_errors(self):
+        log_filter = SamplingFilter(rate=0.0)
+        for level in (logging.WARNING, logging.ERROR, logging.CRITICAL):
+            self.assertTrue(log_filter.filter(make_record(level=level)))
+
+    def test_samples_routine_records_by_rate(self):
+        self.assertFalse(SamplingFilter(rate=0.0).filter(make_record()))
+        self.assertTrue(SamplingFilter(rate=1.0).filter(make_record()))
+        with mock.patch('students.logging_utils.random.random', return_value=0.3):
+            self.assertTrue(SamplingFilter(rate=0.5).filter(make_record()))
+            self.assertFalse(SamplingFilter(rate=0.2).filter(make_record()))
+
+
+class StructuredFormatterTests(SimpleTestCase):
+    def test_renders_message_and_extra_fields_as_key_value(self):
+        line = StructuredFormatter().format(make_record(event='students.scanned', count=3, user='jo smith'))
+        self.assertIn('level=INFO', line)
+        self.assertIn('logger=students.test', line)
+        self.assertIn('msg="hello world"', line)
+        self.assertIn('event=students.scanned', line)
+        self.assertIn('count=3', line)
+        self.assertIn('user="jo smith"', line)
+
+
+class StartQueueListenerTests(SimpleTestCase):
+    def setUp(self):
+        self.logger_name = 'students.tests.queue'
+        self.logger = logging.getLogger(self.logger_name)
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.records = []
+        self.handler = logging.Handler()
+        self.handler.emit = self.records.append
+        self.logger.addHandler(self.handler)
+        self.logger.addFilter(SamplingFilter(rate=0.0))
+
+    def tearDown(self):
+        stop_queue_listener(self.logger_name)
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        for log_filter in list(self.logger.filters):
+            self.logger.removeFilter(log_filter)
+
+    def test_moves_handlers_and_filters_behind_queue(self):
+        start_queue_listener(self.logger_name)
+        self.assertEqual(len(self.logger.handlers), 1)
+        self.assertIsInstance(self.logger.handlers[0], DeferredQueueHandler)
+        self.assertEqual(self.logger.filters, [])
+
+        child = logging.getLogger(f'{self.logger_name}.child')
+        child.info('dropped by sampling')
+        child.error('kept %d', 1)
+        stop_queue_listener(self.logger_name)
+
+        self.assertEqual([r.getMessage() for r in self.records], ['kept 1'])
+
+    def test_second_call_returns_same_listener(self):
+        listener = start_queue_listener(self.logger_name)
+        self.assertIs(start_queue_listener(self.logger_name), listener)
+        self.assertEqual(len(self.logger.handlers), 1)
+
+
+class UserCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used_beyond_max_size(self):
+        users = UserCache(max_size=2)
+        users.set(1, User(pk=1))
+        users.set(2, User(pk=2))
+        users.get(1)
+        users.set(3, User(pk=3))
+        self.assertIsNotNone(users.get(1))
+        self.assertIsNone(users.get(2))
+        self.assertIsNotNone(users.get(3))
+
+    def test_entries_expire_after_ttl(self):
+        users = UserCache(ttl=60)
+        with mock.patch('students.auth_backends.time.monotonic', return_value=100.0):
+            users.set(1, User(pk=1))
+        with mock.patch('students.auth_backends.time.monotonic', return_value=159.0):
+            self.assertIsNotNone(users.get(1))
+        with mock.patch('students.auth_backends.time.monotonic', return_value=161.0):
+            self.assertIsNone(users.get(1))
+
+    def test_get_returns_a_copy(self):
+        users = UserCache()
+        users.set(1, User(pk=1, username='alice'))
+        first = users.get(1)
+        first.username = 'changed'
+        self.assertEqual(users.get(1).username, 'alice')
+        self.assertIsNot(users.get(1), users.get(1))
+
+    def test_version_mismatch_is_a_miss(self):
+        users = UserCache()
+        users.set(1, User(pk=1), version='v1')
+        self.assertIsNone(users.get(1, version='v2'))
+        self.assertIsNone(users.get(1, version='v1'))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'old-password')
+        self.backend = CachedModelBackend()
+
+    def test_second_lookup_is_served_from_cache(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk).username, 'alice')
+
+    def test_password_change_invalidates_cached_user(self):
+        old_hash = self.backend.get_user(self.user.pk).password
+        self.user.set_password('new-password')
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertNotEqual(self.backend.get_user(self.user.pk).password, old_hash)
+
+    def test_change_from_another_worker_invalidates_cached_user(self):
+        self.backend.get_user(self.user.pk)
+        # Another process saved the user: only the shared version key changes here
+        cache.set(user_version_key(self.user.pk), 'from-other-worker', None)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_deleted_user_is_evicted(self):
+        self.backend.get_user(self.user.pk)
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_closed_open_half_open_closed(self):
+        breaker = CircuitBreaker('dynamodb', failure_threshold=2, reset_timeout=30)
+        with mock.patch('students.resilience.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertFalse(breaker.allow())
+        with mock.patch('students.resilience.time.monotonic', return_value=131.0):
+            self.assertTrue(breaker.allow())
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.metrics()['opened_total'], 1)
+        self.assertEqual(breaker.metrics()['rejected_total'], 1)
+
+    def test_half_open_allows_a_single_trial_call(self):
+        breaker = CircuitBreaker('s3', failure_threshold=1, reset_timeout=30)
+        with mock.patch('students.resilience.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+        with mock.patch('students.resilience.time.monotonic', return_value=131.0):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertFalse(breaker.allow())
+
+
+class ServiceGuardTests(SimpleTestCase):
+    def test_deadline_exceeded_counts_as_failure(self):
+        guard = ServiceGuard(timeouts={'scan': 0.05}, failure_threshold=1)
+        release = threading.Event()
+        try:
+            with self.assertRaises(DeadlineExceeded):
+                guard.call('dynamodb', 'scan', release.wait, 5)
+        finally:
+            release.set()
+        with self.assertRaises(CircuitOpenError):
+            guard.call('dynamodb', 'scan', lambda: None)
+        self.assertEqual(guard.metrics()['breakers']['dynamodb']['state'], CircuitBreaker.OPEN)
+
+    def test_client_errors_do_not_trip_the_breaker(self):
+        guard = ServiceGuard(failure_threshold=1)
+        error = ClientError({'Error': {'Code': 'ValidationException'}, 'ResponseMetadata': {'HTTPStatusCode': 400}}, 'GetItem')
+        with self.assertRaises(ClientError):
+            guard.call('dynamodb', 'get_item', mock.Mock(side_effect=error))
+        self.assertEqual(guard.call('dynamodb', 'get_item', lambda: 42), 42)
+
+
+class StaleSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        self.client = mock.Mock()
+        self.manager = StudentManager.__new__(StudentManager)
+        self.manager.guard = ServiceGuard(failure_threshold=1, reset_timeout=60)
+        self.manager.dynamodb_client = self.client
+        self.manager.students_table_name = 'StudentRecords'
+        self.manager.courses_table_name = 'Courses'
+        self.manager._snapshots = {}
+        self.manager._student_snapshots = {}
+        self.user = User(pk=1, username='alice')
+        self.student = {'student_id': 'S1', 'first_name': 'Ada', 'user_id': '1'}
+        self.outage = EndpointConnectionError(endpoint_url='https://dynamodb')
+
+    def test_get_all_students_serves_stale_list_after_failure(self):
+        self.client.scan.side_effect = [{'Items': [to_dynamodb(self.student)]}, self.outage]
+        fresh = self.manager.get_all_students(user=self.user)
+        self.assertFalse(getattr(fresh, 'stale', False))
+        stale = self.manager.get_all_students(user=self.user)
+        self.assertIsInstance(stale, StaleList)
+        self.assertEqual(stale, [self.student])
+        self.assertEqual(self.manager.guard.metrics()['stale_serves'], {'get_all_students': 1})
+
+    def test_get_all_courses_without_snapshot_returns_empty(self):
+        self.client.scan.side_effect = self.outage
+        self.assertEqual(self.manager.get_all_courses(), [])
+
+    def test_get_student_serves_stale_dict_while_circuit_is_open(self):
+        self.client.get_item.side_effect = [{'Item': to_dynamodb(self.student)}, self.outage]
+        self.manager.get_student('S1', user=self.user)
+        self.manager.get_student('S1', user=self.user)  # fails and opens the breaker
+        stale = self.manager.get_student('S1', user=self.user)
+        self.assertIsInstance(stale, StaleDict)
+        self.assertEqual(stale['first_name'], 'Ada')
+        self.assertEqual(self.client.get_item.call_count, 2)
+        self.assertIsNone(self.manager.get_student('S1', user=User(pk=2, username='bob')))
+
+    def test_writes_fail_fast_while_circuit_is_open(self):
+        self.client.delete_item.side_effect = self.outage
+        with self.assertRaises(ServiceUnavailable):
+            self.manager.update_course('MSc', {'name': 'MSc AI', 'duration': '1 year'})
+        with self.assertRaises(CircuitOpenError):
+            self.manager.add_course({'name': 'MSc AI', 'duration': '1 year'})
+        self.client.get_item.assert_not_called()
+
+    def test_student_writes_raise_while_circuit_is_open_without_snapshot(self):
+        self.manager.guard.breaker('dynamodb').record_failure()
+        with self.assertRaises(CircuitOpenError):
+            self.manager.update_student('S1', {'first_name': 'Ada'}, user=self.user)
+        with self.assertRaises(CircuitOpenError):
+            self.manager.delete_student('S1', user=self.user)
+        self.client.put_item.assert_not_called()
+        self.client.delete_item.assert_not_called()
+
+    def test_update_never_writes_from_stale_snapshot(self):
+        self.manager.guard = ServiceGuard(failure_threshold=5)
+        self.client.get_item.side_effect = [{'Item': to_dynamodb(self.student)}, self.outage]
+        self.manager.get_student('S1', user=self.user)
+        with self.assertRaises(ServiceUnavailable):
+            self.manager.update_student('S1', {'first_name': 'Grace'}, user=self.user)
+        self.client.put_item.assert_not_called()
+
+    def test_seed_courses_does_not_treat_outage_as_empty_table(self):
+        self.client.scan.side_effect = self.outage
+        with self.assertRaises(ServiceUnavailable):
+            self.manager.seed_courses()
+        self.client.put_item.assert_not_called()
+
+
+class ServiceUnavailableMiddlewareTests(SimpleTestCase):
+    def make_request(self, method):
+        request = getattr(RequestFactory(), method)('/manage-courses/')
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        return request
+
+    def test_failed_post_becomes_message_and_redirect(self):
+        middleware = ServiceUnavailableMiddleware(lambda request: None)
+        request = self.make_request('post')
+        response = middleware.process_exception(request, CircuitOpenError('DYNAMODB is temporarily unavailable.'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, '/manage-courses/')
+        self.assertEqual(
+            [str(m) for m in get_messages(request)],
+            ['Your changes were not saved. DYNAMODB is temporarily unavailable.'],
+        )
+
+    def test_ignores_get_requests_and_other_errors(self):
+        middleware = ServiceUnavailableMiddleware(lambda request: None)
+        self.assertIsNone(middleware.process_exception(self.make_request('get'), CircuitOpenError('down')))
+        self.assertIsNone(middleware.process_exception(self.make_request('post'), ValueError('bug')))
@@ -16,4 +16,5 @@ urlpatterns = [
     path('manage-courses/', views.manage_courses, name='manage_courses'),
     path('student-report/', views.student_report, name='student_report'),
     path('profile/', views.profile, name='profile'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,5 +1,8 @@
+import os
+
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login, get_user
 from .student_utils import StudentManager
@@ -9,6 +12,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth import login
 from .forms import CustomUserCreationForm
 from django.contrib import messages
+from django.http import JsonResponse
 
 class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(required=True, help_text="Required. Enter a valid email address.")
@@ -19,12 +23,16 @@ class CustomUserCreationForm(UserCreationForm):
 
 student_manager = StudentManager()
 
+def warn_if_stale(request, *results):
+    if any(getattr(result, 'stale', False) for result in results):
+        messages.warning(request, 'Some data could not be refreshed and may be out of date.')
+
 def signup(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
             user = form.save()
-            login(request, user)
+            login(request, user, backend='students.auth_backends.CachedModelBackend')
             messages.success(request, f'Account created successfully! Welcome to your dashboard.')
             return redirect('dashboard')
         else:
@@ -35,8 +43,11 @@ def signup(request):
 
 @login_required
 def dashboard(request):
-    total_courses = len(student_manager.get_all_courses())
-    total_students = len(student_manager.get_all_students(user=request.user))
+    courses = student_manager.get_all_courses()
+    students = student_manager.get_all_students(user=request.user)
+    warn_if_stale(request, courses, students)
+    total_courses = len(courses)
+    total_students = len(students)
     return render(request, 'dashboard.html', {
         'total_courses': total_courses,
         'total_students': total_students
@@ -45,11 +56,13 @@ def dashboard(request):
 @login_required
 def student_list(request):
     students = student_manager.get_all_students(user=request.user)
+    warn_if_stale(request, students)
     return render(request, 'student_list.html', {'students': students})
 
 @login_required
 def student_detail(request, student_id):
     student = student_manager.get_student(student_id, user=request.user)
+    warn_if_stale(request, student)
     if not student:
         return render(request, 'student_detail.html', {'error': 'Student not found or access denied'})
     return render(request, 'student_detail.html', {'student': student})
@@ -64,6 +77,7 @@ def student_update(request, student_id):
         else:
             return render(request, 'student_form.html', {'action': 'Update', 'error': 'Failed to update student or access denied'})
     student = student_manager.get_student(student_id, user=request.user)
+    warn_if_stale(request, student)
     if not student:
         return render(request, 'student_form.html', {'error': 'Student not found or access denied'})
     return render(request, 'student_form.html', {'student': student, 'action': 'Update'})
@@ -74,6 +88,7 @@ def student_delete(request, student_id):
         if student_manager.delete_student(student_id, user=request.user):
             return redirect('manage_students')
     student = student_manager.get_student(student_id, user=request.user)
+    warn_if_stale(request, student)
     if not student:
         return render(request, 'student_detail.html', {'error': 'Student not found or access denied'})
     return render(request, 'student_detail.html', {'student': student})
@@ -93,11 +108,13 @@ def manage_students(request):
             if student_id:
                 student_manager.delete_student(student_id, user=request.user)
                 return redirect('manage_students')
+    warn_if_stale(request, students)
     return render(request, 'manage_students.html', {'students': students})
 
 @login_required
 def courses(request):
     courses = student_manager.get_all_courses()
+    warn_if_stale(request, courses)
     return render(request, 'courses.html', {'courses': courses})
 
 @login_required
@@ -112,6 +129,7 @@ def manage_courses(request):
                 if success:
                     return redirect('manage_courses')
                 else:
+                    warn_if_stale(request, courses)
                     return render(request, 'manage_courses.html', {
                         'courses': courses,
                         'error': f"Course '{course_name}' already exists. Please choose a different name."
@@ -125,18 +143,26 @@ def manage_courses(request):
                 if success:
                     return redirect('manage_courses')
                 else:
+                    warn_if_stale(request, courses)
                     return render(request, 'manage_courses.html', {
                         'courses': courses,
                         'error': "Failed to update course. Please try again."
                     })
+    warn_if_stale(request, courses)
     return render(request, 'manage_courses.html', {'courses': courses})
 
 @login_required
 def student_report(request):
     students = student_manager.get_all_students(user=request.user)
+    warn_if_stale(request, students)
     return render(request, 'student_report.html', {'students': students})
 
 @login_required
 def profile(request):
     user = request.user
-    return render(request, 'profile.html', {'user': user})
\ No newline at end of file
+    return render(request, 'profile.html', {'user': user})
+
+@staff_member_required
+def metrics(request):
+    # Breakers and counters are per process: this reports the worker that served the request
+    return JsonResponse({'pid': os.getpid(), **student_manager.guard.metrics()})